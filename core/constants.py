@@ -55,6 +55,29 @@ LOG_STYLE_HUMAN = "human"
 LOG_STYLE_CI = "ci"
 
 
+# ======================================================================
+# 本地缓存配置
+# 可在多次运行之间复用的中间结果存放位置（相对于项目根目录）。
+# ======================================================================
+
+# 缓存根目录，已在 .gitignore 中忽略
+CACHE_DIR = ".cache"
+
+# 单次运行内存缓存的容量上限（按缓存的总行数计）
+# 多个配置共用同一上游源时，下载结果与清洗结果在本轮运行中复用，超出上限时淘汰最早的条目。
+RUN_CACHE_MAX_LINES = 1_000_000
+
+# 清洗结果磁盘缓存的开关（环境变量）
+# 设置 PAHUB_CACHE=1 后，处理结果按 (版本, 阶段, 过滤配置, 原始数据) 的摘要保存到 CACHE_DIR/clean，
+# 上游内容未变化的重复运行可以跳过清洗。
+CLEAN_CACHE_ENV = "PAHUB_CACHE"
+
+# 清洗结果缓存的版本号（参与缓存键计算）
+# 修改清洗器、类型映射表或处理器等会影响处理结果的逻辑时，必须同步递增该值，
+# 旧版本的缓存文件不再命中；也可以直接删除 CACHE_DIR/clean 目录。
+CLEAN_CACHE_VERSION = 1
+
+
 # ======================================================================
 # 网络请求配置
 # 定义进行网络下载时使用的默认设置。
@@ -67,6 +90,23 @@ DEFAULT_REQUEST_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
+# 并发下载的最大线程数
+# 下载属于 I/O 密集型任务，多个源同时请求可以让总耗时接近最慢的单个源。
+# 所有线程共用 downloader 中的连接池 (pool_maxsize=32)，线程数需不大于连接池容量。
+DOWNLOAD_MAX_WORKERS = 16
+
+
+# ======================================================================
+# 规则处理并行配置
+# 超大规则源的清洗阶段可以拆分到多个进程中执行。
+# ======================================================================
+
+# 触发多进程清洗的最少行数
+# 低于该行数时进程启动与数据传输的开销大于收益，直接在当前进程内清洗。
+PROCESS_PARALLEL_MIN_LINES = 500_000
+# 每个子进程任务处理的行数
+PROCESS_CHUNK_LINES = 100_000
+
 
 # ======================================================================
 # 规则类型优先级配置
@@ -1,24 +1,82 @@
 # core/downloader.py
 
+import codecs
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-from core.constants import DEFAULT_REQUEST_HEADERS, MSG_ERROR
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.constants import DEFAULT_REQUEST_HEADERS, DOWNLOAD_MAX_WORKERS, MSG_ERROR
 from core.logger import Logger
 
 
-def download_sources(url_list: list[str]) -> list[str]:
+def _build_session() -> requests.Session:
+    """
+    创建共享的 HTTP 会话。
+    连接池会复用同一主机的 TCP/TLS 连接，避免每个源都重新握手。
+    """
+    session = requests.Session()
+    session.headers.update(DEFAULT_REQUEST_HEADERS)
+
+    # 仅对临时性错误重试；raise_on_status=False 让最终的错误状态码
+    # 仍然交给 raise_for_status 处理，保持 "HTTP xxx" 的错误信息
+    retry = Retry(
+        total=2,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# 模块级会话：所有下载线程共用同一个连接池
+_SESSION = _build_session()
+
+# 流式读取时每次从套接字取出的字节数
+_CHUNK_SIZE = 64 * 1024
+
+
+def fetch_sources(url_list: list[str]) -> list[tuple[list[str] | None, str | None]]:
+    """
+    [下载器：抓取阶段]
+
+    并发下载全部源，只返回每个源的 (行列表, 错误信息)，不输出任何日志。
+    可以放到后台线程中提前执行，结果再交给 download_sources 汇总与报告。
+    """
+    if not url_list:
+        return []
+
+    # 并发下载：网络等待期间线程会释放 GIL，总耗时取决于最慢的源而非所有源之和
+    # _download_single_url 保持同步实现，各线程共用模块级 _SESSION 的连接池
+    # executor.map 按输入顺序返回结果，保证日志和合并顺序与源列表一致
+    max_workers = min(DOWNLOAD_MAX_WORKERS, len(url_list))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_download_single_url, url_list))
+
+
+def download_sources(url_list: list[str], results=None) -> list[str]:
     """
     [下载器主入口]
 
     负责批量下载规则源。
     注意：这里不再包含任何中文字符串，全部调用 Logger 的变量。
+
+    results: 可选，预先由 fetch_sources 抓取好的结果；未提供时当场下载。
     """
     all_lines = []
     total_sources = len(url_list)
+    if total_sources == 0:
+        return all_lines
 
-    for i, url in enumerate(url_list, 1):
-        # 执行单个下载
-        lines, error_msg = _download_single_url(url)
+    if results is None:
+        results = fetch_sources(url_list)
 
+    for i, (url, (lines, error_msg)) in enumerate(zip(url_list, results), 1):
         # [清洗点 1] 标签生成：使用 WORD_SOURCE_DATA ("源数据")
         source_tag = f"{Logger.WORD_SOURCE_DATA} [{i}/{total_sources}]"
 
@@ -47,10 +105,12 @@ def _download_single_url(url: str) -> tuple[list[str] | None, str | None]:
     这里的错误信息也使用了 Logger 的变量。
     """
     try:
-        resp = requests.get(url, headers=DEFAULT_REQUEST_HEADERS, timeout=15)
-        resp.raise_for_status()
-        resp.encoding = "utf-8"
-        return resp.text.splitlines(), None
+        # 流式读取：逐块解码并切分行，不再先拼出完整的 resp.text 再 splitlines，
+        # 避免同一份数据在内存中同时存在两份完整拷贝
+        with _SESSION.get(url, timeout=15, stream=True) as resp:
+            resp.raise_for_status()
+            lines = _split_stream_lines(resp.iter_content(chunk_size=_CHUNK_SIZE))
+        return lines, None
 
     except requests.exceptions.HTTPError as e:
         # 使用 HTTP 状态码变量 (虽然这通常是英文，但我们可以加上前缀)
@@ -62,3 +122,29 @@ def _download_single_url(url: str) -> tuple[list[str] | None, str | None]:
         return None, f"{Logger.WORD_NET_ERR}"
     except Exception as e:
         return None, f"Error: {e}"
+
+
+def _split_stream_lines(chunks) -> list[str]:
+    """
+    将流式字节块按 UTF-8 解码并切分为行。
+    规则源统一按 UTF-8 处理，直接使用增量解码器，不经过 requests 的编码探测；
+    多字节字符被块边界截断时由解码器自动衔接，非法字节替换为 U+FFFD。
+
+    只按 "\n" 切分 (str.split 远比识别各种 Unicode 换行符的 splitlines 快)，
+    "\r\n" 行尾残留的 "\r" 会在后续清洗阶段随 strip() 一并去除。
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    lines = []
+    pending = ""
+
+    for chunk in chunks:
+        parts = (pending + decoder.decode(chunk)).split("\n")
+        # 最后一段可能是尚未结束的半行，留到下一块拼接
+        pending = parts.pop()
+        lines.extend(parts)
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        lines.append(pending)
+
+    return lines
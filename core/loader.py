@@ -1,25 +1,90 @@
 # core/loader.py
 
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 import yaml
-from core.constants import MSG_ERROR, MSG_WARN, MSG_INFO, MSG_DEBUG
+from core.constants import CACHE_DIR, MSG_ERROR, MSG_WARN, MSG_INFO, MSG_DEBUG
 from core.logger import Logger
 
+# 优先使用 libyaml 提供的 C 解析器，未编译 libyaml 时回退到纯 Python 实现
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+def _sidecar_path(path: str) -> str:
+    """配置文件对应的 JSON 缓存路径，目录结构与 configs 保持一致"""
+    return os.path.join(os.getcwd(), CACHE_DIR, os.path.relpath(path) + ".json")
+
+
+def _read_sidecar(cache_path: str, src_mtime: float) -> dict | None:
+    """
+    读取 JSON 缓存。
+    缓存不存在、比源文件旧或已损坏时返回 None，由调用方重新解析 YAML。
+    """
+    try:
+        if os.path.getmtime(cache_path) < src_mtime:
+            return None
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_sidecar(cache_path: str, cfg: dict) -> None:
+    """
+    写入 JSON 缓存。
+    只缓存能被 JSON 原样还原的配置（如 YAML 中的日期、整数键无法还原），
+    写入失败不影响正常流程。
+    """
+    try:
+        payload = json.dumps(cfg, ensure_ascii=False)
+        if json.loads(payload) != cfg:
+            return
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # 先写临时文件再替换，避免其他进程读到写了一半的缓存
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        pass
+
 
-def _load_single_config(path: str) -> dict | None:
+def _load_single_config(path: str, entry: os.DirEntry | None = None) -> dict | None:
     """
     读取并解析单个 YAML 文件。
+    entry 可由调用方传入（扫描目录时得到的 DirEntry），复用其 stat 缓存，避免重复 stat。
+    扫描之后文件可能已被删除或改名，stat 也放在异常兜底之内。
     """
     try:
+        if entry is not None:
+            mtime = entry.stat().st_mtime
+        else:
+            mtime = os.path.getmtime(path)
+
+        # 命中 JSON 缓存时跳过 YAML 解析，缓存可以跨进程复用
+        cache_path = _sidecar_path(path)
+        cached = _read_sidecar(cache_path, mtime)
+        if cached:
+            return cached
+
         with open(path, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f)
+            # 直接传入文件对象，YAML 错误信息中会带上配置文件路径
+            cfg = yaml.load(f, Loader=_YamlLoader)
             if not cfg:
                 # [清洗点] 配置文件为空
                 Logger.log_generic_message(
                     MSG_ERROR, Logger.WORD_CONFIG_EMPTY, source=os.path.basename(path)
                 )
                 return None
-            return cfg
+
+        _write_sidecar(cache_path, cfg)
+        return cfg
 
     except FileNotFoundError:
         # [清洗点] 文件未找到
@@ -77,10 +142,11 @@ def _preprocess_config(cfg: dict) -> dict | None:
     cfg["formats"] = [fmt.lower() for fmt in cfg.get("formats", [])]
 
     # 4. 标准化 Headers
-    standardized_headers = {}
-    for fmt, headers in cfg.get("custom_headers", {}).items():
-        standardized_headers[fmt.lower()] = headers
-    cfg["custom_headers"] = standardized_headers
+    # 键名已经全部小写时（最常见的写法）直接复用原字典，不再重建
+    raw_headers = cfg.get("custom_headers") or {}
+    if any(fmt != fmt.lower() for fmt in raw_headers):
+        raw_headers = {fmt.lower(): headers for fmt, headers in raw_headers.items()}
+    cfg["custom_headers"] = raw_headers
 
     # 5. 校验 Sources
     raw_sources = cfg.get("sources", [])
@@ -91,10 +157,12 @@ def _preprocess_config(cfg: dict) -> dict | None:
         )
         return None
 
+    # 每项只 strip 一次，空字符串与非字符串项直接丢弃
     valid_sources = []
-    for item in raw_sources:
-        if isinstance(item, str) and item.strip():
-            valid_sources.append(item.strip())
+    if raw_sources:
+        valid_sources = [
+            s for s in (item.strip() for item in raw_sources if isinstance(item, str)) if s
+        ]
 
     if not valid_sources:
         # [清洗点] sources 为空
@@ -121,8 +189,54 @@ def _build_formats_data(cfg: dict) -> dict:
     return cfg
 
 
+def _load_and_prepare(item) -> dict | None:
+    """
+    单个配置文件的完整加载流程：读取解析 -> 预处理 -> 打包格式参数。
+    item 为 _scan_config_files 产出的 (DirEntry, 相对子目录)。
+    """
+    entry, sub_path = item
+
+    cfg = _load_single_config(entry.path, entry)
+    if not cfg:
+        return None
+
+    cfg["__filename__"] = entry.name
+
+    cfg["__sub_path__"] = sub_path
+
+    cfg = _preprocess_config(cfg)
+    if cfg:
+        cfg = _build_formats_data(cfg)
+    return cfg
+
+
+def _scan_config_files(directory: str, sub_path: str = ""):
+    """
+    递归扫描配置目录，产出 (DirEntry, 相对子目录)。
+    先产出当前目录的文件再进入子目录，顺序与 os.walk 一致；
+    DirEntry 自带路径与 stat 缓存，省去 os.path.join 和额外的 stat 调用。
+    """
+    subdirs = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry)
+            elif entry.is_file() and entry.name.endswith((".yaml", ".yml")):
+                yield entry, sub_path
+
+    for entry in subdirs:
+        yield from _scan_config_files(entry.path, os.path.join(sub_path, entry.name))
+
+
+def _load_captured(item):
+    """(线程池) 加载单个配置，日志暂存起来交回调用方按顺序输出"""
+    return Logger.capture(_load_and_prepare, item)
+
+
 def load_all_configs(subdir: str = "rule") -> list[dict]:
-    """主加载函数"""
+    """
+    主加载函数
+    """
     configs_dir = os.path.join(os.getcwd(), "configs", subdir)
     prepared_configs = []
 
@@ -131,28 +245,23 @@ def load_all_configs(subdir: str = "rule") -> list[dict]:
         Logger.debug(f"Dir not found: {configs_dir}", tag="LOADER")
         return prepared_configs
 
-    for root, dirs, files in os.walk(configs_dir):
-        for file in files:
-            if file.endswith((".yaml", ".yml")):
-                path = os.path.join(root, file)
-
-                rel_dir = os.path.relpath(root, configs_dir)
-                if rel_dir == ".":
-                    sub_path = ""
-                else:
-                    sub_path = rel_dir
-
-                cfg = _load_single_config(path)
-                if not cfg:
-                    continue
-
-                cfg["__filename__"] = file
+    entries = list(_scan_config_files(configs_dir))
+    if not entries:
+        return prepared_configs
 
-                cfg["__sub_path__"] = sub_path
+    if len(entries) == 1:
+        prepared_configs = [cfg for cfg in map(_load_and_prepare, entries) if cfg]
+        return prepared_configs
 
-                cfg = _preprocess_config(cfg)
-                if cfg:
-                    cfg = _build_formats_data(cfg)
-                    prepared_configs.append(cfg)
+    # 各配置文件互不依赖：读取、解析和预处理都放到线程池中并行执行
+    # 文件读取等待 I/O 时会释放 GIL，线程数按 CPU 核心数的 4 倍估算，上限 32
+    # executor.map 按输入顺序返回结果，各文件的日志也按扫描顺序回放，
+    # 输出与逐个加载时完全一致，不受线程调度影响
+    max_workers = min(32, (os.cpu_count() or 1) * 4, len(entries))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for cfg, pending in executor.map(_load_captured, entries):
+            Logger.replay(pending)
+            if cfg:
+                prepared_configs.append(cfg)
 
     return prepared_configs
@@ -1,6 +1,7 @@
 # core/logger.py
 
 import sys
+import threading
 import time
 
 from core.constants import (
@@ -15,6 +16,46 @@ from core.constants import (
 )
 
 
+# 线程本地的日志暂存区：Logger.capture() 期间当前线程的输出先记在这里，
+# 由调用方按固定顺序回放，避免多线程并发时日志顺序随调度变化
+_capture = threading.local()
+
+
+# --- 视觉素材 ---
+# 以模块级常量的形式存放，方法内直接按名称引用（LOAD_GLOBAL），
+# 省去每次 cls.ICONS[...] 的属性查找与字典下标
+ICON_APP = "🚀"
+ICON_PHASE = "📌"
+ICON_TASK = "📦"
+ICON_DOWN = "📥"
+ICON_PROC = "⚙️"
+ICON_WRITE = "💾"
+ICON_DONE = "✨"
+ICON_SUCCESS = "✅"
+ICON_FAIL = "❌"
+ICON_WARN = "⚠️"
+ICON_INFO = "ℹ️"
+ICON_DEBUG = "🐛"
+TREE_BRANCH = "  ├──"
+TREE_END = "  └──"
+TREE_SUB = "  │   "
+ARROW = "➔"
+
+# --- ANSI 颜色代码 ---
+RESET = "\033[0m"
+RED = "\033[31m"
+GREEN = "\033[32m"
+YELLOW = "\033[33m"
+BLUE = "\033[34m"
+CYAN = "\033[36m"
+GRAY = "\033[90m"
+
+
+def _noop(*args, **kwargs):
+    """被关闭的日志方法统一替换为此空操作"""
+    return None
+
+
 class Logger:
     """
     [核心模块：业务型日志器 V5 - Modern Emoji Edition]
@@ -27,37 +68,43 @@ class Logger:
     show_debug = False
     is_ci_mode = False
 
-    # --- 视觉素材 (新) ---
+    # --- 视觉素材 (按键名动态查找时使用，值来自模块级常量) ---
     ICONS = {
-        "APP": "🚀",
-        "PHASE": "📌",
-        "TASK": "📦",
-        "DOWN": "📥",
-        "PROC": "⚙️",
-        "WRITE": "💾",
-        "DONE": "✨",
-        "SUCCESS": "✅",
-        "FAIL": "❌",
-        "WARN": "⚠️",
-        "INFO": "ℹ️",
-        "DEBUG": "🐛",
-        "TREE_BRANCH": "  ├──",
-        "TREE_END": "  └──",
-        "TREE_SUB": "  │   ",
-        "ARROW": "➔",
+        "APP": ICON_APP,
+        "PHASE": ICON_PHASE,
+        "TASK": ICON_TASK,
+        "DOWN": ICON_DOWN,
+        "PROC": ICON_PROC,
+        "WRITE": ICON_WRITE,
+        "DONE": ICON_DONE,
+        "SUCCESS": ICON_SUCCESS,
+        "FAIL": ICON_FAIL,
+        "WARN": ICON_WARN,
+        "INFO": ICON_INFO,
+        "DEBUG": ICON_DEBUG,
+        "TREE_BRANCH": TREE_BRANCH,
+        "TREE_END": TREE_END,
+        "TREE_SUB": TREE_SUB,
+        "ARROW": ARROW,
     }
 
-    # --- ANSI 颜色代码 (新) ---
+    # --- ANSI 颜色代码 (供 _c 按颜色名查找) ---
     COLORS = {
-        "RESET": "\033[0m",
-        "RED": "\033[31m",
-        "GREEN": "\033[32m",
-        "YELLOW": "\033[33m",
-        "BLUE": "\033[34m",
-        "CYAN": "\033[36m",
-        "GRAY": "\033[90m",
+        "RESET": RESET,
+        "RED": RED,
+        "GREEN": GREEN,
+        "YELLOW": YELLOW,
+        "BLUE": BLUE,
+        "CYAN": CYAN,
+        "GRAY": GRAY,
     }
 
+    # --- 预编译的颜色模板 (汇总报告等固定着色场景直接 format) ---
+    _GREEN_FMT = GREEN + "{}" + RESET
+    _RED_FMT = RED + "{}" + RESET
+    _GRAY_FMT = GRAY + "{}" + RESET
+    _CYAN_FMT = CYAN + "{}" + RESET
+
     # =================================================================
     # 📖 [配置中心] 文案大字典
     # =================================================================
@@ -102,6 +149,7 @@ class Logger:
         "NET_ERR": "网络错误",
         "PROCESS_FAIL": "处理失败",
         "CRASH": "崩溃",
+        "POOL_BROKEN": "进程池异常，剩余任务改为逐个隔离执行",
         "EXCEPTION": "异常",
         # --- 标签 ---
         "DEBUG": "调试",
@@ -122,56 +170,21 @@ class Logger:
         "valid": "有效",
     }
 
-    # =================================================================
-    # 🔗 [变量映射层]
-    # 这一部分必须完整保留，否则外部模块调用时会报错 AttributeError
-    # =================================================================
-    WORD_RULE = TEXT["RULE"]
-    WORD_REWRITE = TEXT["REWRITE"]
-    WORD_TASK = TEXT["TASK"]
-    WORD_QUEUE = TEXT["QUEUE"]
-    WORD_SOURCE_DATA = TEXT["SOURCE_DATA"]
-    WORD_ROWS = TEXT["ROWS"]
-
-    WORD_FOUND = TEXT["FOUND"]
-    WORD_START = TEXT["START"]
-    WORD_PROCESS = TEXT["PROCESS"]
-    WORD_DOWNLOAD = TEXT["DOWNLOAD"]
-    WORD_WRITING = TEXT["WRITING"]
-    WORD_WRITE_OK = TEXT["WRITE_OK"]
-    WORD_DONE = TEXT["DONE"]
-    WORD_SUCCESS = TEXT["SUCCESS"]
-    WORD_FAIL = TEXT["FAIL"]
-    WORD_FINISH = TEXT["FINISH"]
-
-    WORD_SUMMARY = TEXT["SUMMARY"]
-    WORD_STATS = TEXT["STATS"]
-    WORD_TOTAL = TEXT["TOTAL"]
-    WORD_PROBLEM = TEXT["Problem"]
-    WORD_DATA_DETAIL = TEXT["DATA_DETAIL"]
-
-    # --- 错误映射 (Loader等模块依赖这些变量) ---
-    WORD_FILE_NOT_FOUND = TEXT["FILE_NOT_FOUND"]
-    WORD_YAML_ERR = TEXT["YAML_ERR"]
-    WORD_CONFIG_EMPTY = TEXT["CONFIG_EMPTY"]
-    WORD_NAME_NOT_SET = TEXT["NAME_NOT_SET"]
-    WORD_CONFIG_DISABLED = TEXT["CONFIG_DISABLED"]
-    WORD_ENABLED_TYPE_ERR = TEXT["ENABLED_TYPE_ERR"]
-    WORD_ENABLED_UNKNOWN = TEXT["ENABLED_UNKNOWN"]
-    WORD_SOURCES_NOT_LIST = TEXT["SOURCES_NOT_LIST"]
-    WORD_SOURCES_EMPTY = TEXT["SOURCES_EMPTY"]
-    WORD_NO_OUTPUT_FMT = TEXT["NO_OUTPUT_FMT"]
-    WORD_DIR_FAIL = TEXT["DIR_FAIL"]
-    WORD_WRITE_FAIL = TEXT["WRITE_FAIL"]
-    WORD_NET_ERR = TEXT["NET_ERR"]
-    WORD_PROCESS_FAIL = TEXT["PROCESS_FAIL"]
-    WORD_CRASH = TEXT["CRASH"]
-    WORD_EXCEPTION = TEXT["EXCEPTION"]
-
-    WORD_DEBUG = TEXT["DEBUG"]
-    WORD_INFO = TEXT["INFO"]
-    WORD_WARN = TEXT["WARN"]
-    WORD_ERROR = TEXT["ERROR"]
+    # --- 通用消息分发表 ---
+    # 消息类型 -> (图标, 颜色, CI 标注前缀, 输出等级)
+    _GENERIC = {
+        MSG_ERROR: (ICON_FAIL, "RED", "::error::", LOG_LEVEL_DEFAULT),
+        MSG_WARN: (ICON_WARN, "YELLOW", "::warning::", LOG_LEVEL_DEFAULT),
+        MSG_INFO: (ICON_SUCCESS, "GRAY", "", LOG_LEVEL_INFO),
+        MSG_DEBUG: (ICON_DEBUG, "GRAY", "", LOG_LEVEL_DEBUG),
+    }
+
+    # --- 按日志等级门控的方法 ---
+    # 等级未开启时，这些方法在 init() 中被替换为空操作，
+    # 调用时不再拼接文本、上色，也不再进入 _print 判断
+    _DETAIL_METHODS = ("log_download_start", "log_task_done")
+    _DEBUG_METHODS = ("debug", "log_stats_data", "log_write_job")
+    _ORIGINAL_METHODS = {}
 
     @classmethod
     def init(cls, level=LOG_LEVEL_DEFAULT, style="human"):
@@ -185,21 +198,81 @@ class Logger:
         elif level >= LOG_LEVEL_INFO:
             cls.show_detail = True
 
+        # 上色函数在初始化时一次性绑定：CI 模式下直接返回原文本，
+        # 之后的每次调用都不再重复判断模式
+        color_impl = "_c_plain" if cls.is_ci_mode else "_c_ansi"
+        cls._c = vars(cls)[color_impl]
+
+        cls._gate_methods(cls._DETAIL_METHODS, cls.show_detail)
+        cls._gate_methods(cls._DEBUG_METHODS, cls.show_debug)
+
+        # 关闭行缓冲：日志先攒在缓冲区里，按阶段整块写出，减少 write() 系统调用
+        reconfigure = getattr(sys.stdout, "reconfigure", None)
+        if reconfigure is not None:
+            reconfigure(line_buffering=False, write_through=False)
+
+    @classmethod
+    def flush(cls):
+        """把缓冲区中的日志写出 (阶段结束、程序结束或输出异常堆栈前调用)"""
+        sys.stdout.flush()
+
     @classmethod
-    def _print(cls, text, level=LOG_LEVEL_DEFAULT, use_flush=True):
-        """核心打印门卫"""
+    def _gate_methods(cls, names, enabled):
+        """(内部工具) 开启时恢复原方法，关闭时替换为空操作"""
+        for name in names:
+            original = cls._ORIGINAL_METHODS.setdefault(name, vars(cls)[name])
+            setattr(cls, name, original if enabled else staticmethod(_noop))
+
+    @classmethod
+    def _print(cls, text, level=LOG_LEVEL_DEFAULT, use_flush=False):
+        """
+        核心打印门卫
+        默认只写入缓冲区，由 flush() 在阶段边界统一刷出；错误与警告立即刷出，
+        保证 GitHub Actions 中的 ::error:: 标注与其他输出顺序一致。
+        """
         if level == LOG_LEVEL_DEBUG and not cls.show_debug:
             return
         if level == LOG_LEVEL_INFO and not cls.show_detail:
             return
+        pending = getattr(_capture, "pending", None)
+        if pending is not None:
+            pending.append((text, use_flush))
+            return
         print(text, flush=use_flush)
 
     @classmethod
-    def _c(cls, text, color_key):
-        """(内部工具) 给文本上色"""
-        if cls.is_ci_mode or color_key not in cls.COLORS:
+    def capture(cls, func, *args):
+        """
+        在当前线程执行 func(*args)，期间的日志不直接输出而是暂存下来
+        返回: (func 的结果, 暂存的日志)，日志交给 replay() 输出
+        """
+        _capture.pending = pending = []
+        try:
+            return func(*args), pending
+        finally:
+            _capture.pending = None
+
+    @classmethod
+    def replay(cls, pending):
+        """按原样输出 capture() 暂存的日志 (等级已在暂存时过滤)"""
+        for text, use_flush in pending:
+            print(text, flush=use_flush)
+
+    @staticmethod
+    def _c_plain(text, color_key):
+        """(内部工具) CI 模式：不上色"""
+        return text
+
+    @classmethod
+    def _c_ansi(cls, text, color_key):
+        """(内部工具) 终端模式：按颜色表上色"""
+        color = cls.COLORS.get(color_key)
+        if color is None:
             return text
-        return f"{cls.COLORS[color_key]}{text}{cls.COLORS['RESET']}"
+        return f"{color}{text}{RESET}"
+
+    # 上色函数 (给文本上色)：默认按终端模式上色，init() 按输出风格重新绑定
+    _c = _c_ansi
 
     # =================================================================
     # 📢 [业务层] 喊话方法 (UI重构版)
@@ -212,7 +285,7 @@ class Logger:
             cls._print("--- ProxyAssetsHub Start ---")
         else:
             title = cls._c("ProxyAssetsHub 启动", "CYAN")
-            cls._print(f"\n{cls.ICONS['APP']} {title}\n")
+            cls._print(f"\n{ICON_APP} {title}\n")
 
     @classmethod
     def log_phase_start(cls, phase_name, task_count):
@@ -229,7 +302,7 @@ class Logger:
         if cls.is_ci_mode:
             cls._print(f"--- Phase: {phase_name} ({task_count}) ---")
         else:
-            msg = f"{cls.ICONS['PHASE']} {display_name}{cls.TEXT['TASK']} (共 {task_count} 个)"
+            msg = f"{ICON_PHASE} {display_name}{cls.TEXT['TASK']} (共 {task_count} 个)"
             cls._print(cls._c(msg, "BLUE"))
 
     @classmethod
@@ -239,12 +312,12 @@ class Logger:
             cls._print(f"[TASK] {name}")
         else:
             idx_str = f"[{index}/{total}]"
-            cls._print(f"\n{cls.ICONS['TASK']} {cls._c(idx_str, 'YELLOW')} {cls._c(name, 'GREEN')}")
+            cls._print(f"\n{ICON_TASK} {cls._c(idx_str, 'YELLOW')} {cls._c(name, 'GREEN')}")
 
     @classmethod
     def log_download_start(cls, count):
         """下载开始 (树枝)"""
-        msg = f"{cls.ICONS['TREE_BRANCH']} {cls.ICONS['DOWN']} {cls.WORD_DOWNLOAD}: {count} 个{cls.TEXT['SOURCE_DATA']}..."
+        msg = f"{TREE_BRANCH} {ICON_DOWN} {cls.WORD_DOWNLOAD}: {count} 个{cls.TEXT['SOURCE_DATA']}..."
         cls._print(msg, level=LOG_LEVEL_INFO)
 
     @classmethod
@@ -264,76 +337,69 @@ class Logger:
                     parts.append(f"[{label}: {val}]")
         
         if parts:
-            flow_str = f" {cls.ICONS['ARROW']} ".join(parts)
-            msg = f"{cls.ICONS['TREE_BRANCH']} {cls.ICONS['PROC']} {cls.TEXT['PROCESS']}: {cls._c(flow_str, 'GRAY')}"
+            flow_str = f" {ARROW} ".join(parts)
+            msg = f"{TREE_BRANCH} {ICON_PROC} {cls.TEXT['PROCESS']}: {cls._c(flow_str, 'GRAY')}"
             cls._print(msg, level=LOG_LEVEL_DEBUG)
 
     @classmethod
     def log_write_job(cls, fmt):
         """写入开始 (树枝)"""
-        msg = f"{cls.ICONS['TREE_BRANCH']} {cls.ICONS['WRITE']} {cls.WORD_WRITING}: {fmt}..."
+        msg = f"{TREE_BRANCH} {ICON_WRITE} {cls.WORD_WRITING}: {fmt}..."
         cls._print(msg, level=LOG_LEVEL_DEBUG)
 
     @classmethod
     def log_generic_message(cls, msg_type, text, source=""):
         """通用消息 (自动适配树状结构)"""
-        prefix_tree = cls.ICONS['TREE_SUB'] + " " 
+        spec = cls._GENERIC.get(msg_type)
+        if spec is None:
+            return
+
+        tag, color, ci_prefix, level = spec
         prefix_source = f"[{source}] " if source else ""
-        
-        if msg_type == MSG_ERROR:
-            tag = cls.ICONS['FAIL']
-            content = cls._c(f"{prefix_source}{text}", "RED")
-            if cls.is_ci_mode:
-                cls._print(f"::error::{prefix_source}{text}")
-            else:
-                cls._print(f"{prefix_tree}{tag} {content}")
-
-        elif msg_type == MSG_WARN:
-            tag = cls.ICONS['WARN']
-            content = cls._c(f"{prefix_source}{text}", "YELLOW")
-            if cls.is_ci_mode:
-                cls._print(f"::warning::{prefix_source}{text}")
-            else:
-                cls._print(f"{prefix_tree}{tag} {content}")
-
-        elif msg_type == MSG_INFO:
-            tag = cls.ICONS['SUCCESS'] 
+        body = f"{prefix_source}{text}"
+
+        # 错误与警告在 CI 模式下输出为 GitHub Actions 标注
+        if cls.is_ci_mode and ci_prefix:
+            cls._print(f"{ci_prefix}{body}", use_flush=True)
+            return
+
+        if not cls.is_ci_mode:
             # 只有明确包含“保存成功”字样的信息才标绿，其他为灰
-            color = "GREEN" if cls.TEXT['WRITE_OK'] in text else "GRAY"
-            content = cls._c(f"{prefix_source}{text}", color)
-            cls._print(f"{prefix_tree}{tag} {content}", level=LOG_LEVEL_INFO)
+            if msg_type == MSG_INFO and cls.WORD_WRITE_OK in text:
+                color = "GREEN"
+            body = cls._c(body, color)
 
-        elif msg_type == MSG_DEBUG:
-            tag = cls.ICONS['DEBUG']
-            content = cls._c(f"{prefix_source}{text}", "GRAY")
-            cls._print(f"{prefix_tree}{tag} {content}", level=LOG_LEVEL_DEBUG)
+        # 默认等级的消息 (错误/警告) 立即刷出
+        cls._print(
+            f"{TREE_SUB} {tag} {body}",
+            level=level,
+            use_flush=level == LOG_LEVEL_DEFAULT,
+        )
 
     @classmethod
     def log_task_done(cls, duration):
         """任务耗时 (树底)"""
         time_str = f"{duration:.2f}s"
-        msg = f"{cls.ICONS['TREE_END']} {cls.ICONS['DONE']} {cls.WORD_DONE} ({cls.WORD_DONE}: {cls._c(time_str, 'CYAN')})"
+        msg = f"{TREE_END} {ICON_DONE} {cls.WORD_DONE} ({cls.WORD_DONE}: {cls._c(time_str, 'CYAN')})"
         cls._print(msg, level=LOG_LEVEL_INFO)
 
     @classmethod
     def log_final_summary(cls, total_time, stats, errors):
         """汇总报告 (卡片式)"""
         if cls.is_ci_mode:
-            cls._print(f"\n[SUMMARY] Done in {total_time:.2f}s")
+            cls._print(f"\n[SUMMARY] Done in {total_time:.2f}s", use_flush=True)
             return
 
-        print("")
-        line = cls._c("-" * 40, "GRAY")
-        cls._print(line)
-        title = f"{cls.ICONS['APP']} {cls.WORD_SUMMARY}"
-        cls._print(f"{title}")
-        cls._print(line)
+        # 整张卡片先拼成行列表，最后一次 write + flush 输出
+        line = cls._GRAY_FMT.format("-" * 40)
+        out = ["", line, f"{ICON_APP} {cls.WORD_SUMMARY}", line]
 
         if errors:
-            cls._print(f"{cls.ICONS['FAIL']} {cls.WORD_FOUND} {len(errors)} {cls.TEXT['Problem']}:")
-            for i, err in enumerate(errors, 1):
-                cls._print(cls._c(f"  {i}. {err}", "RED"))
-            cls._print(line)
+            out.append(f"{ICON_FAIL} {cls.WORD_FOUND} {len(errors)} {cls.TEXT['Problem']}:")
+            out.extend(
+                cls._RED_FMT.format(f"  {i}. {err}") for i, err in enumerate(errors, 1)
+            )
+            out.append(line)
 
         if stats:
             for cat, s in stats.items():
@@ -343,22 +409,34 @@ class Logger:
                 
                 part1 = f"{cat_name:<6}"
                 part2 = f"{cls.WORD_TOTAL}: {s['total']}"
-                part3 = f"{cls.WORD_SUCCESS}: {cls._c(str(s['success']), 'GREEN')}"
+                part3 = f"{cls.WORD_SUCCESS}: {cls._GREEN_FMT.format(s['success'])}"
                 
-                fail_color = "RED" if s['fail'] > 0 else "GRAY"
-                part4 = f"{cls.WORD_FAIL}: {cls._c(str(s['fail']), fail_color)}"
+                fail_fmt = cls._RED_FMT if s['fail'] > 0 else cls._GRAY_FMT
+                part4 = f"{cls.WORD_FAIL}: {fail_fmt.format(s['fail'])}"
                 
-                cls._print(f"  {part1} | {part2} | {part3} | {part4}")
+                out.append(f"  {part1} | {part2} | {part3} | {part4}")
 
-        cls._print(line)
-        end_msg = f"{cls.ICONS['DONE']} {cls.WORD_FINISH} : {cls._c(f'{total_time:.2f}s', 'CYAN')}"
-        cls._print(end_msg)
-        cls._print("")
+        out.append(line)
+        out.append(f"{ICON_DONE} {cls.WORD_FINISH} : {cls._CYAN_FMT.format(f'{total_time:.2f}s')}")
+        out.append("")
+
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
 
     @classmethod
     def debug(cls, message, tag=""):
         """兼容接口"""
-        prefix = cls.ICONS['TREE_SUB'] + " "
+        prefix = TREE_SUB + " "
         tag_str = f"[{tag}] " if tag else ""
         content = cls._c(f"{tag_str}{message}", "GRAY")
-        cls._print(f"{prefix}{cls.ICONS['DEBUG']} {content}", level=LOG_LEVEL_DEBUG)
\ No newline at end of file
+        cls._print(f"{prefix}{ICON_DEBUG} {content}", level=LOG_LEVEL_DEBUG)
+
+
+# =================================================================
+# 🔗 [变量映射层]
+# 为 TEXT 中的每个词条生成 Logger.WORD_<KEY> 别名 (如 "Problem" -> WORD_PROBLEM)。
+# 外部模块依赖这些变量，TEXT 中的词条不能删除，否则调用时会报错 AttributeError
+# =================================================================
+for _key, _text in Logger.TEXT.items():
+    setattr(Logger, f"WORD_{_key.upper()}", _text)
+del _key, _text
@@ -1,20 +1,35 @@
 # core/manager.py
 
+import contextlib
+import hashlib
+import io
+import multiprocessing
 import os
+import pickle
+import queue
+import sys
+import threading
 import time
 import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain
 
 from core.loader import load_all_configs
-from core.downloader import download_sources
-from core.writer import write_output
+from core.downloader import download_sources, fetch_sources
+from core.writer import write_output, write_outputs
 from core.logger import Logger
 from core.constants import (
+    CACHE_DIR,
+    CLEAN_CACHE_ENV,
+    CLEAN_CACHE_VERSION,
     MSG_ERROR,
     MSG_WARN,
     LOG_LEVEL_DEFAULT,
     LOG_LEVEL_INFO,
     LOG_LEVEL_DEBUG,
     LOG_STYLE_HUMAN,
+    RUN_CACHE_MAX_LINES,
 )
 
 from core.rule.processor_rule import process_rules
@@ -26,7 +41,9 @@ from core.rule import (
 )
 from core.rewrite import formatter_rewrite_quantumultx, formatter_rewrite_loon
 
-AVAILABLE_FORMATTERS = {
+
+# 各阶段可用的格式化模块
+_FORMATTER_MODULES = {
     "rule": {
         "quantumultx": formatter_rule_quantumultx,
         "loon": formatter_rule_loon,
@@ -38,6 +55,26 @@ AVAILABLE_FORMATTERS = {
     },
 }
 
+
+def _formatter_entry(fmt, module):
+    """
+    (内部工具) 导入时一次性读取格式化模块的元数据
+    返回: (format_rules 函数, 输出目录名, 文件扩展名, 注释符号)
+    """
+    return (
+        module.format_rules,
+        getattr(module, "DIR_NAME", fmt.capitalize()),
+        getattr(module, "FILE_EXTENSION", "list"),
+        getattr(module, "COMMENT_SYMBOL", "#"),
+    )
+
+
+# 阶段 -> 格式名 -> 元数据元组，写入时直接解包，不再逐次 getattr
+AVAILABLE_FORMATTERS = {
+    category: {fmt: _formatter_entry(fmt, module) for fmt, module in modules.items()}
+    for category, modules in _FORMATTER_MODULES.items()
+}
+
 PIPELINE_HANDLERS = {
     "rule": process_rules,
     "rewrite": process_rewrites,
@@ -45,6 +82,80 @@ PIPELINE_HANDLERS = {
 
 EXECUTION_ORDER = ["rule", "rewrite"]
 
+# 子进程内的任务执行器，由进程池的 initializer 创建
+_WORKER_MANAGER = None
+
+
+def _init_worker(level, style):
+    """(进程池) 子进程初始化：每个子进程持有自己的 Manager 与 Logger 开关"""
+    global _WORKER_MANAGER
+    _WORKER_MANAGER = Manager(level=level, style=style)
+
+
+def _worker(cfg, category):
+    """
+    (进程池) 在子进程中执行单个任务
+    日志与异常堆栈写入内存缓冲区，随结果一起交回主进程按任务顺序输出。
+    返回: (是否成功, 汇总错误信息, 是否崩溃, 日志文本)
+    """
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+        result = _WORKER_MANAGER._run_task(cfg, category)
+        _WORKER_MANAGER._wait_errors()
+    return result + (buffer.getvalue(),)
+
+
+def _read_clean_cache(cache_path):
+    """(内部工具) 读取磁盘上的处理结果缓存；不存在或已损坏时返回 None"""
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+
+
+def _write_clean_cache(cache_path, result):
+    """(内部工具) 写入处理结果缓存，写入失败不影响正常流程"""
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # 先写临时文件再替换，避免并行任务读到写了一半的缓存
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+class _RunCache:
+    """
+    (内部工具) 单次运行的内存缓存
+    按缓存内容的总行数限额，超出时先淘汰最早写入的条目。
+    """
+
+    def __init__(self, max_lines=RUN_CACHE_MAX_LINES):
+        self.max_lines = max_lines
+        self.total_lines = 0
+        self._data = {}
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        entry = self._data.get(key)
+        return entry[0] if entry is not None else None
+
+    def put(self, key, value, size):
+        if size > self.max_lines or key in self._data:
+            return
+        self._data[key] = (value, size)
+        self.total_lines += size
+
+        # dict 保持插入顺序，迭代得到的第一个键即最早写入的条目
+        while self.total_lines > self.max_lines:
+            oldest = next(iter(self._data))
+            self.total_lines -= self._data.pop(oldest)[1]
+
 
 class Manager:
     """
@@ -54,14 +165,33 @@ class Manager:
     所有的日志输出都委托给 Logger，确保文案统一。
     """
 
-    def __init__(self, level=LOG_LEVEL_DEFAULT, style=LOG_STYLE_HUMAN):
+    def __init__(self, level=LOG_LEVEL_DEFAULT, style=LOG_STYLE_HUMAN, jobs=1):
         self.project_root = os.getcwd()
         Logger.init(level, style)
 
+        self.level = level
+        self.style = style
+        # 并行任务数：0 表示使用全部 CPU 核心，1 为逐个顺序执行
+        self.jobs = jobs or os.cpu_count() or 1
         self.debug_mode = level >= LOG_LEVEL_DEBUG
         self.summary_errors = []
         self.stats = {}
 
+        # 调试模式下的异常堆栈：任务只负责入队，由后台线程格式化并写到 stderr
+        self._err_queue = queue.Queue()
+        if self.debug_mode:
+            threading.Thread(target=self._drain_errors, daemon=True).start()
+
+        # 本轮运行缓存：{url: 下载结果} 与 {内容摘要: 处理结果}
+        # 多个配置共用同一上游时，每个源只下载一次、相同内容只清洗一次
+        self._url_cache = _RunCache()
+        self._clean_cache = _RunCache()
+
+        # 跨运行的处理结果磁盘缓存，需通过环境变量显式开启
+        self._clean_cache_dir = None
+        if os.environ.get(CLEAN_CACHE_ENV) == "1":
+            self._clean_cache_dir = os.path.join(self.project_root, CACHE_DIR, "clean")
+
     def run(self):
         """程序入口"""
         start_time = time.time()
@@ -92,41 +222,220 @@ class Manager:
         fail_count = 0
 
         # 2. 遍历任务
-        for i, cfg in enumerate(configs, 1):
+        for cfg, (ok, err_msg, crashed) in self._iter_task_results(configs, category):
+            if ok:
+                success_count += 1
+                continue
+
+            fail_count += 1
             name = cfg.get("name", "Unknown")
-            Logger.log_task_start(i, total, name)
+            # [清洗点] 记录处理失败；异常崩溃总是记录到汇总
+            if crashed or not self.summary_errors or name not in self.summary_errors[-1]:
+                self.summary_errors.append(err_msg)
+
+        self.stats[category] = {
+            "total": total,
+            "success": success_count,
+            "fail": fail_count,
+        }
 
-            task_start = time.time()
+        # 阶段结束：等待异常堆栈写完，再一次性刷出本阶段缓冲的日志
+        self._wait_errors()
+        Logger.flush()
+
+    def _iter_task_results(self, configs, category):
+        """
+        按配置顺序产出 (cfg, 任务结果)
+        jobs > 1 时任务交给进程池并行执行，日志仍按配置顺序整块输出。
+        """
+        total = len(configs)
+        workers = min(self.jobs, total)
+
+        if workers <= 1:
+            # 顺序执行时用一个后台线程预取下一个任务的源：
+            # 当前任务清洗、写入的同时，下一个任务的下载已经在进行
+            with ThreadPoolExecutor(max_workers=1) as prefetcher:
+                pending = self._prefetch(prefetcher, configs[0])
+                for i, cfg in enumerate(configs, 1):
+                    fetched = pending
+                    if i < total:
+                        pending = self._prefetch(prefetcher, configs[i])
+
+                    Logger.log_task_start(i, total, cfg.get("name", "Unknown"))
+                    yield cfg, self._run_task(cfg, category, fetched)
+            return
+
+        with self._new_pool(workers) as executor:
+            futures = [executor.submit(_worker, cfg, category) for cfg in configs]
+            pool_broken = False
+            for i, (cfg, future) in enumerate(zip(configs, futures), 1):
+                name = cfg.get("name", "Unknown")
+                try:
+                    ok, err_msg, crashed, output = future.result()
+                except BrokenProcessPool as e:
+                    # 有子进程异常退出 (如 OOM、被信号终止)：进程池已不可用，所有未完成的任务
+                    # 都会收到该异常，无法判断是哪个任务导致的。已完成的结果照常使用，
+                    # 其余任务各自放进独立的子进程重跑，导致崩溃的任务只会拖垮它自己的进程
+                    Logger.log_task_start(i, total, name)
+                    if not pool_broken:
+                        pool_broken = True
+                        msg = f"{Logger.WORD_POOL_BROKEN}: {e}"
+                        Logger.log_generic_message(MSG_WARN, msg, source="SYSTEM")
+                    yield cfg, self._run_isolated(cfg, category)
+                    continue
+                except Exception as e:
+                    # 单个任务的结果无法交回 (如无法序列化)：与顺序执行一样记为崩溃
+                    Logger.log_task_start(i, total, name)
+                    yield cfg, self._crash_result(name, e)
+                    continue
+
+                Logger.log_task_start(i, total, name)
+                sys.stdout.write(output)
+                yield cfg, (ok, err_msg, crashed)
+
+    def _new_pool(self, workers):
+        """
+        (内部工具) 创建执行任务的进程池
+        使用 spawn 启动子进程，避免 fork 时继承下载线程池与连接池的锁状态
+        """
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.level, self.style),
+        )
+
+    def _run_isolated(self, cfg, category):
+        """
+        (内部工具) 在单独的一次性子进程中执行单个任务
+        进程池损坏后用于重跑未完成的任务：子进程再次异常退出时只把该任务记为崩溃，
+        主进程不受影响
+        返回: (是否成功, 汇总错误信息, 是否崩溃)
+        """
+        with self._new_pool(1) as executor:
             try:
-                if self._process_single_task(cfg, category, processor_func):
-                    success_count += 1
-                else:
-                    fail_count += 1
-                    # [清洗点] 记录处理失败
-                    err_msg = f"{name}: {Logger.WORD_PROCESS_FAIL}"
-                    if not self.summary_errors or name not in self.summary_errors[-1]:
-                        self.summary_errors.append(err_msg)
+                ok, err_msg, crashed, output = executor.submit(
+                    _worker, cfg, category
+                ).result()
             except Exception as e:
-                fail_count += 1
-                # [清洗点] 异常崩溃
-                msg = f"{Logger.WORD_EXCEPTION}: {e}"
-                Logger.log_generic_message(MSG_ERROR, msg, source="SYSTEM")
+                return self._crash_result(cfg.get("name", "Unknown"), e)
+
+        sys.stdout.write(output)
+        return ok, err_msg, crashed
 
-                # 记录到汇总
-                self.summary_errors.append(f"{name} ({Logger.WORD_CRASH}: {e})")
+    def _prefetch(self, executor, cfg):
+        """(内部工具) 在后台提交任务的源下载；任务不会进入下载阶段时返回 None"""
+        sources = cfg.get("sources", [])
+        if not sources or not cfg.get("formats_data"):
+            return None
+        return executor.submit(self._fetch_sources, sources)
+
+    def _fetch_sources(self, sources):
+        """
+        带本轮缓存的源下载：同一 URL 在一次运行中只下载一次
+        只缓存成功的结果，失败的源在后续任务中仍会重新尝试
+        """
+        cache = self._url_cache
+        missing = [url for url in dict.fromkeys(sources) if url not in cache]
+        fresh = dict(zip(missing, fetch_sources(missing)))
+
+        results = [fresh[url] if url in fresh else cache.get(url) for url in sources]
+
+        for url, result in fresh.items():
+            lines = result[0]
+            if lines is not None:
+                cache.put(url, result, len(lines))
+
+        return results
+
+    def _process_cached(self, cfg, category, processor_func, raw_data):
+        """
+        带缓存的数据处理
+        以 (缓存版本, 阶段, 过滤配置, 原始数据) 的摘要为键，相同输入直接复用上次的处理结果；
+        开启磁盘缓存时，内存未命中会再查找 CACHE_DIR/clean 下的结果文件。
+        处理逻辑变化时递增 CLEAN_CACHE_VERSION，旧的磁盘缓存随之失效
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"v{CLEAN_CACHE_VERSION}".encode())
+        digest.update(category.encode())
+        digest.update(repr(cfg.get("filters")).encode())
+        # 逐行喂给摘要，避免为了算键先拼出整份原始数据的 str 与 bytes 副本
+        update = digest.update
+        for line in raw_data:
+            update(line.encode())
+            update(b"\n")
+        key = digest.digest()
+
+        cached = self._clean_cache.get(key)
+        if cached is not None:
+            final_data, stats = cached
+            return final_data, dict(stats)
+
+        cache_path = None
+        if self._clean_cache_dir:
+            cache_path = os.path.join(self._clean_cache_dir, f"{key.hex()}.pkl")
+            cached = _read_clean_cache(cache_path)
+
+        if cached is not None:
+            final_data, stats = cached
+        else:
+            final_data, stats = processor_func(cfg, raw_data)
+            if cache_path:
+                _write_clean_cache(cache_path, (final_data, stats))
+
+        self._clean_cache.put(key, (final_data, stats), len(final_data))
+        return final_data, dict(stats)
+
+    def _run_task(self, cfg, category, fetched=None):
+        """
+        执行单个任务 (含异常兜底与耗时日志)
+        fetched: 可选，后台预取源数据的 Future
+        返回: (是否成功, 汇总错误信息, 是否崩溃)
+        """
+        processor_func = PIPELINE_HANDLERS[category]
+        name = cfg.get("name", "Unknown")
 
-                if self.debug_mode:
-                    traceback.print_exc()
+        task_start = time.time()
+        try:
+            if self._process_single_task(cfg, category, processor_func, fetched):
+                return True, None, False
+            return False, f"{name}: {Logger.WORD_PROCESS_FAIL}", False
+        except Exception as e:
+            return self._crash_result(name, e)
+        finally:
+            Logger.log_task_done(time.time() - task_start)
+
+    def _crash_result(self, name, e):
+        """
+        (内部工具) 记录任务崩溃，需在 except 块内调用
+        返回: 与 _run_task 相同格式的失败结果
+        """
+        # [清洗点] 异常崩溃
+        msg = f"{Logger.WORD_EXCEPTION}: {e}"
+        Logger.log_generic_message(MSG_ERROR, msg, source="SYSTEM")
+
+        if self.debug_mode:
+            # 先刷出缓冲的日志，保证堆栈出现在对应任务的输出之后
+            Logger.flush()
+            self._err_queue.put(sys.exc_info())
+
+        return False, f"{name} ({Logger.WORD_CRASH}: {e})", True
+
+    def _drain_errors(self):
+        """(后台线程) 逐个格式化队列中的异常并写到 stderr"""
+        while True:
+            exc_info = self._err_queue.get()
+            try:
+                sys.stderr.write("".join(traceback.format_exception(*exc_info)))
+                sys.stderr.flush()
             finally:
-                Logger.log_task_done(time.time() - task_start)
+                self._err_queue.task_done()
 
-        self.stats[category] = {
-            "total": total,
-            "success": success_count,
-            "fail": fail_count,
-        }
+    def _wait_errors(self):
+        """等待已入队的异常堆栈全部写出"""
+        self._err_queue.join()
 
-    def _process_single_task(self, cfg, category, processor_func):
+    def _process_single_task(self, cfg, category, processor_func, fetched=None):
         """处理单个任务"""
         name = cfg.get("name", "Unknown")
         formats_data = cfg.get("formats_data", {})
@@ -140,12 +449,16 @@ class Manager:
         sources = cfg.get("sources", [])
         Logger.log_download_start(len(sources))
 
-        raw_data = download_sources(sources)
+        if fetched is not None:
+            results = fetched.result()
+        else:
+            results = self._fetch_sources(sources)
+        raw_data = download_sources(sources, results)
         if not raw_data:
             return False
 
         # --- 处理 ---
-        final_data, stats = processor_func(cfg, raw_data)
+        final_data, stats = self._process_cached(cfg, category, processor_func, raw_data)
         Logger.log_stats_data(stats)
 
         # --- 写入 ---
@@ -165,59 +478,52 @@ class Manager:
         if not formatter:
             return False
 
-        dir_name = getattr(formatter, "DIR_NAME", fmt.capitalize())
-        file_ext = getattr(formatter, "FILE_EXTENSION", "list")
-        comment_sym = getattr(formatter, "COMMENT_SYMBOL", "#")
+        format_rules, dir_name, file_ext, comment_sym = formatter
 
         policy = fmt_params.get("policy_tag", "Default")
         headers = fmt_params.get("header_lines", [])
 
-        formatted_result = formatter.format_rules(
-            data, policy_tag=policy, header_lines=headers
-        )
+        formatted_result = format_rules(data, policy_tag=policy, header_lines=headers)
 
         if not formatted_result:
             return False
 
         sub_path = cfg.get("__sub_path__", "")
 
-        if isinstance(formatted_result, list):
-            # 兼容 Quantumult X 等只返回一个列表的情况
-            return write_output(
+        if isinstance(formatted_result, dict):
+            # 处理 Clash 这种返回多个分类的情况
+            # Key 就是 "Domain", "IP", "Classical"，拼接为文件名后缀，例如 "_Domain"
+            # 同一目录下的多个文件交给 write_outputs 一次处理
+            outputs = {
+                f"_{suffix_key}": content_list
+                for suffix_key, content_list in formatted_result.items()
+            }
+            return write_outputs(
                 project_root=self.project_root,
                 category=category,
                 subdir_name=dir_name,
                 cfg=cfg,
-                rules=formatted_result,
+                outputs=outputs,
                 comment_symbol=comment_sym,
                 file_extension=file_ext,
                 sub_path=sub_path,
-                filename_suffix="",  # 无后缀
             )
 
-        elif isinstance(formatted_result, dict):
-            # 处理 Clash 这种返回多个分类的情况
-            all_success = True
-
-            for suffix_key, content_list in formatted_result.items():
-                # suffix_key 就是 "Domain", "IP", "Classical"
-                # 拼接后缀，例如 "_Domain"
-                suffix = f"_{suffix_key}"
-
-                success = write_output(
-                    project_root=self.project_root,
-                    category=category,
-                    subdir_name=dir_name,
-                    cfg=cfg,
-                    rules=content_list,
-                    comment_symbol=comment_sym,
-                    file_extension=file_ext,
-                    sub_path=sub_path,
-                    filename_suffix=suffix,  # 传入后缀
-                )
-                if not success:
-                    all_success = False
-
-            return all_success
-
-        return False
+        # 兼容 Quantumult X 等只返回一组规则行的情况 (列表或生成器)
+        # 生成器总是真值：先取出第一行判断是否为空，无需为判空物化整个结果
+        lines = iter(formatted_result)
+        first_line = next(lines, None)
+        if first_line is None:
+            return False
+
+        return write_output(
+            project_root=self.project_root,
+            category=category,
+            subdir_name=dir_name,
+            cfg=cfg,
+            rules=chain((first_line,), lines),
+            comment_symbol=comment_sym,
+            file_extension=file_ext,
+            sub_path=sub_path,
+            filename_suffix="",  # 无后缀
+        )
@@ -1,5 +1,9 @@
 # core/rewrite/formatter_rewrite_loon.py
 
+from collections.abc import Iterator
+
+from core.writer import render_header_lines
+
 # ----------------------------------------------------------------------
 # 模块元数据常量
 # 定义输出文件相关的基本信息，用于 Loon 的重写（Rewrite）配置文件。
@@ -15,7 +19,7 @@ FILE_EXTENSION = "plugin"
 
 def format_rules(
     rules: list[str], policy_tag: str = "Default", header_lines: list[str] = None
-) -> list[str]:
+) -> Iterator[str]:
     """
     重写规则格式化函数：将标准格式的重写规则列表转换为 Loon 格式。
 
@@ -28,20 +32,12 @@ def format_rules(
         header_lines (List[str] | None): 用户在配置中定义的额外头部注释行。
 
     返回:
-        List[str]: 格式化后的重写规则列表。
+        Iterator[str]: 逐行产出格式化后的重写规则（生成器，不额外复制整份列表）。
     """
-    formatted = []
-
     # 1. 处理用户自定义头部
-    if header_lines:
-        # 遍历用户定义的头部注释行
-        for header in header_lines:
-            # 在每行前加上注释符号和空格，然后添加到结果中
-            formatted.append(f"{COMMENT_SYMBOL} {header}")
+    # 在每行前加上注释符号和空格
+    yield from render_header_lines(COMMENT_SYMBOL, header_lines)
 
     # 2. 添加规则内容
-    # 由于 Loon 的重写规则格式是通用的，可以直接将清洗后的规则内容（rules）添加到结果列表
-    formatted.extend(rules)
-
-    # 返回包含头部和规则的最终列表
-    return formatted
+    # 由于 Loon 的重写规则格式是通用的，可以直接逐行产出清洗后的规则内容（rules）
+    yield from rules
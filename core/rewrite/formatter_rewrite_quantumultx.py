@@ -1,5 +1,9 @@
 # core/rewrite/formatter_rewrite_quantumultx.py
 
+from collections.abc import Iterator
+
+from core.writer import render_header_lines
+
 # ----------------------------------------------------------------------
 # 模块元数据常量
 # 定义输出文件相关的基本信息，用于 Quantumult X 的重写（Rewrite）配置文件。
@@ -15,18 +19,12 @@ FILE_EXTENSION = "conf"
 
 def format_rules(
     rules: list[str], policy_tag: str = "Default", header_lines: list[str] = None
-) -> list[str]:
+) -> Iterator[str]:
     """
     占位
     """
-    formatted = []
-
     # 1. 处理用户自定义头部
-    if header_lines:
-        for header in header_lines:
-            formatted.append(f"{COMMENT_SYMBOL} {header}")
+    yield from render_header_lines(COMMENT_SYMBOL, header_lines)
 
     # 2. 添加规则内容
-    formatted.extend(rules)
-
-    return formatted
+    yield from rules
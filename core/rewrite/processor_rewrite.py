@@ -10,18 +10,42 @@ def process_rewrites(cfg: dict, raw_rules: list[str]) -> tuple[list[str], dict]:
 
     返回: (清洗后的规则列表, 统计数据字典)
     """
-    final_result = []
     count_raw = len(raw_rules)
-    count_valid = 0
 
-    for line in raw_rules:
-        # 调用简单的清洗函数
-        clean_line = clean_rewrite_line(line)
-        if clean_line:
-            final_result.append(clean_line)
-            count_valid += 1
+    # 调用简单的清洗函数：map/filter 在 C 层完成遍历，空行被 filter(None) 丢弃
+    cleaned = list(filter(None, map(clean_rewrite_line, raw_rules)))
+    count_valid = len(cleaned)
+
+    # 去重：只在同一段落内进行，保留首次出现的位置
+    # 段落标记 (如 [Rewrite]、[MITM]) 决定其后规则的归属，每遇到一个标记都重新开始去重，
+    # 不同源各自的同名段落互不影响；若某段落的内容全部是重复行被去掉，连同其标记一起丢弃
+    seen = set()
+    final_result = []
+    section_start = None  # 当前段落标记在 final_result 中的位置
+    section_deduped = False  # 当前段落是否去掉过重复行
+    for line in cleaned:
+        if line.startswith("[") and line.endswith("]"):
+            if section_deduped and section_start == len(final_result) - 1:
+                final_result.pop()
+            final_result.append(line)
+            section_start = len(final_result) - 1
+            section_deduped = False
+            seen.clear()
+        elif line in seen:
+            section_deduped = True
+        else:
+            seen.add(line)
+            final_result.append(line)
+
+    if section_deduped and section_start == len(final_result) - 1:
+        final_result.pop()
 
     # 生成统计报告
-    stats = {"source": count_raw, "valid": count_valid}
+    stats = {
+        "source": count_raw,
+        "valid": count_valid,
+        "dup_src": count_valid - len(final_result),
+        "total": len(final_result),
+    }
 
     return final_result, stats
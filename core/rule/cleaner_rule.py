@@ -20,10 +20,15 @@
 #    采用“流水线”结构，对主流格式进行精准打击，对极端模糊格式直接丢弃。
 # ======================================================================
 
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
 # --- 配置层：标准化定义 (Global Configuration) ---
+# 以下表均为只读：clean_rule_line 的结果会被缓存，运行期修改这些表会让缓存与配置不一致
 
 # 内部标准类型白名单：只有属于或映射到此集合的规则才被视为有效
-SUPPORTED_TYPES = {
+SUPPORTED_TYPES = frozenset({
     "DOMAIN",
     "DOMAIN-SUFFIX",
     "DOMAIN-KEYWORD",
@@ -34,24 +39,33 @@ SUPPORTED_TYPES = {
     "GEOIP",
     "PROCESS-NAME",
     "USER-AGENT",
-}
+})
 
 # 类型映射表：用于将不同生态的“同义词”统一为内部标准名称
 # 仅做语义明确、业界共识度高的映射，严禁跨层级猜测
-TYPE_MAPPING = {
+TYPE_MAPPING = MappingProxyType({
+    # 部分规则集将 DOMAIN 写作 FULL
+    "FULL": "DOMAIN",
     "HOST": "DOMAIN",
     "HOST-SUFFIX": "DOMAIN-SUFFIX",
     "HOST-WILDCARD": "DOMAIN-WILDCARD",
     "HOST-KEYWORD": "DOMAIN-KEYWORD",
     "IP6-CIDR": "IP-CIDR6",
     "ASN": "IP-ASN",
-}
+})
+
+# 不支持的高级或动态类型：DOMAIN-SET 等涉及外部引用，无法作为单条规则处理
+UNSUPPORTED_TYPES = frozenset({"DOMAIN-SET", "RULE-SET", "URL-REGEX"})
 
 # ======================================================================
 # 公共入口：流水线主控 (Main Pipeline)
 # ======================================================================
 
+# 清洗结果缓存容量：多个上游合并时大量原始行逐字重复，命中后直接返回上次结果
+_CLEAN_CACHE_SIZE = 1_000_000
 
+
+@lru_cache(maxsize=_CLEAN_CACHE_SIZE)
 def clean_rule_line(line: str) -> str | None:
     """
     单行规则清洗入口。通过分层处理，逐步将原始文本提纯为标准规则。
@@ -89,18 +103,18 @@ def _strip_layer(line: str) -> str | None:
     """
     # 1. 处理行内注释
     # 解决：去除 # 及其之后的内容，仅保留有效载荷
-    if "#" in line:
-        line = line.split("#", 1)[0]
-    if "//" in line:
-        line = line.split("//", 1)[0]
+    # AdBlock 网页元素隐藏规则 (## / #@# 开头) 在这一步即被整体截空，随后作为空行丢弃
+    line = line.partition("#")[0]
+    line = line.partition("//")[0]
+
+    # 两端空白只剥离一次，后续判断都基于 content
+    content = line.strip()
 
     # 2. 处理 AdBlock 风格整行注释
     # 特征：以 ! 开头。直接判定为无效行
-    if line.strip().startswith("!"):
+    if content.startswith("!"):
         return None
 
-    content = line.strip()
-
     # 3. 剔除 YAML 列表前缀
     # 特征：以 "- " 开头。解决从 YAML 格式源提取内容的问题
     if content.startswith("- "):
@@ -109,18 +123,10 @@ def _strip_layer(line: str) -> str | None:
     # 4. 剥离成对引号
     # 解决：部分 YAML 数据或字符串化规则自带的包裹引号
     # 采用循环确保剥离所有对称的壳 (如 "'example.com'" -> example.com)
-    while len(content) >= 2 and (
-        (content[0] == '"' and content[-1] == '"')
-        or (content[0] == "'" and content[-1] == "'")
-    ):
+    while len(content) >= 2 and content[0] == content[-1] and content[0] in "\"'":
         content = content[1:-1].strip()
 
-    # 5. 丢弃 AdBlock 网页元素隐藏规则
-    # 特征：以 ## 或 #@# 开头。这些不属于分流规则，必须丢弃
-    if not content or content.startswith("##") or content.startswith("#@#"):
-        return None
-
-    return content
+    return content or None
 
 
 def _normalize_layer(content: str) -> str:
@@ -134,34 +140,29 @@ def _normalize_layer(content: str) -> str:
 
     # 2. 移除域名末尾多余的点 (FQDN 规范化)
     # 解决：例如 "google.com." 与 "google.com" 语义等价，需统一
-    if content.endswith("."):
-        content = content.rstrip(".")
-
-    return content
+    # 无尾点时 rstrip 直接返回原字符串，无需先用 endswith 判断
+    return content.rstrip(".")
 
 
 def _handle_standard_format(line: str) -> str | None:
     """
     【处理器】解析带逗号的标准格式 (TYPE,VALUE,...)
     """
-    parts = [p.strip() for p in line.split(",")]
-    if len(parts) < 2:
+    raw_type, sep, rest = line.partition(",")
+    if not sep:
         return None
 
     # 1. 提取并映射规则类型
-    raw_type = parts[0].upper()
-    value = parts[1]
+    # 只取前两段 (TYPE,VALUE)，其后的附加参数不参与清洗
+    raw_type = raw_type.strip().upper()
+    value = rest.partition(",")[0].strip()
 
     # 2. 兼容性转换
-    # 解决：部分规则集将 DOMAIN 写作 FULL 的情况
-    if raw_type == "FULL":
-        raw_type = "DOMAIN"
-
+    # 解决：同义类型 (如 FULL、HOST) 统一映射为内部标准名称
     final_type = TYPE_MAPPING.get(raw_type, raw_type)
 
     # 3. 过滤不支持的高级或动态类型
-    # 解决：DOMAIN-SET 等涉及外部引用的类型无法作为单条规则处理
-    if final_type in {"DOMAIN-SET", "RULE-SET", "URL-REGEX"}:
+    if final_type in UNSUPPORTED_TYPES:
         return None
 
     # 4. 白名单校验
@@ -175,48 +176,103 @@ def _handle_standard_format(line: str) -> str | None:
 def _handle_compatibility_format(line: str) -> str | None:
     """
     【处理器】解析不带逗号的兼容格式 (推断解析)
+    先按首字符查表选出可能命中的分支组合，再由对应的预编译正则一次匹配决定规则类别，
+    最后交给对应的小处理器拼装。
     """
-    # ------------------------------------------------------------------
-    # 1. IPv6 规则判定 (优先处理)
-    # 特征：包含冒号。允许字母开头（如 2001::）
-    # ------------------------------------------------------------------
-    if ":" in line:
-        if all(c in "0123456789abcdef./: " for c in line):
-            return f"IP-CIDR6,{line}"
+    if not line:
+        return None
 
-    # ------------------------------------------------------------------
+    code = ord(line[0])
+    pattern = _FIRST_CHAR_PATTERNS[code] if code < 128 else _DOMAIN_ONLY_PATTERN
+    match = pattern.match(line)
+    if match is None:
+        return None
+
+    kind = match.lastgroup
+    return _COMPAT_HANDLERS[kind](match.group(kind))
+
+
+# ----------------------------------------------------------------------
+# 兼容格式判定表 (Compatibility Dispatch)
+# ----------------------------------------------------------------------
+# 各分支按优先级从上到下排列，组合成一个正则后一次匹配即可确定类别；
+# 某一分支不满足时自然回落到下一分支，与逐条 if 判断的语义一致。
+_COMPAT_BRANCHES = {
+    # 1. IPv6 规则判定 (优先处理)
+    #    特征：包含冒号，且只由十六进制字符与 ./: 空格 组成。允许字母开头（如 2001::）
+    "ipv6": r"(?P<ipv6>(?=[^:]*:)[0-9a-f./: ]+\Z)",
     # 2. IPv4 / Hosts 规则判定
-    # 特征：以数字开头且包含点
-    # ------------------------------------------------------------------
-    if line[0].isdigit() and "." in line:
-        if all(c in "0123456789./ " for c in line):
-            # 处理 Hosts 格式 (如 127.0.0.1 example.com)
-            parts = line.split()
-            if len(parts) >= 2:
-                return f"DOMAIN,{parts[-1]}"
-            # 纯 IP 或 CIDR 格式
-            return f"IP-CIDR,{line}"
-
-    # ------------------------------------------------------------------
-    # 3. AdBlock / 简写后缀判定
-    # 特征：以 ||, ., +., *. 等前缀开头
-    # ------------------------------------------------------------------
-    if line.startswith("||"):
-        # 剥离前缀并截断 AdBlock 的修饰符 (^, $)
-        content = line[2:].split("^", 1)[0].split("$", 1)[0]
-        if content:
-            return f"DOMAIN-SUFFIX,{content}"
-
-    if line.startswith((".", "+.", "*.")):
-        content = line.lstrip("+*.")
-        if content:
-            return f"DOMAIN-SUFFIX,{content}"
-
-    # ------------------------------------------------------------------
-    # 4. 纯域名兜底处理
-    # 特征：包含点，且不含路径符号(/)或空格
-    # ------------------------------------------------------------------
-    if "." in line and "/" not in line and " " not in line:
-        return f"DOMAIN-SUFFIX,{line}"
-
-    return None
+    #    特征：以数字开头且包含点，只由数字与 ./ 空格 组成
+    "ipv4": r"(?P<ipv4>(?=[^.]*\.)[0-9][0-9./ ]*\Z)",
+    # 3. AdBlock 规则判定
+    #    特征：以 || 开头。截取到 AdBlock 的修饰符 (^, $) 之前
+    "adblock": r"\|\|(?P<adblock>[^^$]+)",
+    # 4. 简写后缀判定
+    #    特征：以 ., +., *. 等前缀开头，剥离全部前缀字符后仍有内容
+    "suffix": r"(?=\.|[+*]\.)[+*.]+(?P<suffix>[^+*.].*)",
+    # 5. 纯域名兜底处理
+    #    特征：包含点，且不含路径符号(/)或空格
+    "domain": r"(?P<domain>[^/ ]*\.[^/ ]*\Z)",
+}
+
+
+def _compile_branches(*names: str) -> re.Pattern:
+    """(内部工具) 按优先级顺序把若干分支拼成一个正则"""
+    ordered = (pattern for name, pattern in _COMPAT_BRANCHES.items() if name in names)
+    # DOTALL 让后缀分支的 ".*" 保留含换行在内的完整剩余内容；各分支用 \Z 而非 $ 锚定结尾，
+    # 避免 $ 在末尾换行前提前匹配。两者都与按字符逐个判断的旧实现保持一致
+    return re.compile("|".join(ordered), re.DOTALL)
+
+
+_DOMAIN_ONLY_PATTERN = _compile_branches("domain")
+
+
+def _build_first_char_table() -> list[re.Pattern]:
+    """
+    (内部工具) 构建首字符 -> 正则 的查找表 (仅 ASCII，非 ASCII 字符只可能命中纯域名分支)
+    每个首字符只保留可能命中的分支，省去注定失败的尝试。
+    """
+    ipv6_first = set("0123456789abcdef./: ")
+    suffix_first = set(".+*")
+
+    table = []
+    for code in range(128):
+        char = chr(code)
+        names = set()
+        if char in ipv6_first:
+            names.add("ipv6")
+        if char.isdigit():
+            names.add("ipv4")
+        if char == "|":
+            names.add("adblock")
+        if char in suffix_first:
+            names.add("suffix")
+        if char not in "/ ":
+            names.add("domain")
+
+        if names == {"domain"}:
+            table.append(_DOMAIN_ONLY_PATTERN)
+        else:
+            table.append(_compile_branches(*names))
+    return table
+
+
+_FIRST_CHAR_PATTERNS = _build_first_char_table()
+
+
+def _compat_ipv4(value: str) -> str:
+    """IPv4 分支：处理 Hosts 格式 (如 127.0.0.1 example.com) 或纯 IP/CIDR"""
+    parts = value.split()
+    if len(parts) >= 2:
+        return f"DOMAIN,{parts[-1]}"
+    return f"IP-CIDR,{value}"
+
+
+# 类别 -> 处理器：入参为对应命名分组匹配到的内容
+_COMPAT_HANDLERS = {
+    "ipv6": lambda value: f"IP-CIDR6,{value}",
+    "ipv4": _compat_ipv4,
+    "adblock": lambda value: f"DOMAIN-SUFFIX,{value}",
+    "suffix": lambda value: f"DOMAIN-SUFFIX,{value}",
+    "domain": lambda value: f"DOMAIN-SUFFIX,{value}",
+}
@@ -1,5 +1,9 @@
 # core/rule/formatter_rule_clash.py
 
+from itertools import chain
+
+from core.writer import render_header_lines
+
 # ----------------------------------------------------------------------
 # 模块元数据常量
 # ----------------------------------------------------------------------
@@ -17,6 +21,18 @@ TYPE_BUCKETS = {
     "IP": ["IP-CIDR", "IP-CIDR6", "GEOIP", "SRC-IP-CIDR", "IP-ASN"],
 }
 
+# 反向索引：标准类型 -> 桶名称 (即输出文件后缀)，导入时由 TYPE_BUCKETS 一次性生成
+# 分桶时一次字典查找即可确定归属，查不到的类型归入 "Classical"
+_BUCKET_NAMES = {"DOMAIN": "Domain", "IP": "IP"}
+TYPE_TO_BUCKET = {
+    std_type: _BUCKET_NAMES[bucket]
+    for bucket, types in TYPE_BUCKETS.items()
+    for std_type in types
+}
+
+# 需要追加 ",no-resolve" 参数的 Clash 规则类型
+_NO_RESOLVE = frozenset(("IP-CIDR", "IP-CIDR6"))
+
 # ----------------------------------------------------------------------
 # 类型映射表
 # ----------------------------------------------------------------------
@@ -47,38 +63,28 @@ def format_rules(
     返回:
         dict: 包含三个分类的字典。
               Key: "Domain", "IP", "Classical"
-              Value: 规则内容列表
+              Value: 逐行产出桶内容的迭代器 (头部 + 去重后的规则)
     """
 
-    # 初始化三个桶的数据结构
-    # 每个桶都先预装好头部信息
-    # 这里的 Key (Domain, IP, Classical) 对应生成文件名的后缀
-    buckets = {"Domain": [], "IP": [], "Classical": []}
-
     # 1. 准备头部信息
     # Clash 规则集文件通常需要以 'payload:' 开头
-    common_headers = ["payload:"]
     # 如果用户配置了自定义头部（如 license 信息），追加到这里
-    if header_lines:
-        for header in header_lines:
-            common_headers.append(f"  {COMMENT_SYMBOL} {header}")
-
-    # 将通用的头部信息预先填入每个桶中
-    for key in buckets:
-        buckets[key].extend(common_headers)
+    # 不可变元组：所有桶的输出迭代器共用这一份头部，不为每个桶复制
+    common_headers = (
+        "payload:",
+        *render_header_lines(f"  {COMMENT_SYMBOL}", header_lines),
+    )
 
-    # 标记桶是否真的有数据（除去头部）
-    has_data = {"Domain": False, "IP": False, "Classical": False}
+    # 初始化三个桶的数据结构
+    # 桶内只收集规则行，通用头部在输出时再拼到每个桶前面
+    # 这里的 Key (Domain, IP, Classical) 对应生成文件名的后缀
+    buckets = {"Domain": [], "IP": [], "Classical": []}
 
     # 2. 遍历并处理每条规则
-    for line in rules:
-        # 简单校验：必须包含逗号
-        if "," not in line:
-            continue
-
-        parts = line.split(",", 1)
-        std_type = parts[0].strip().upper()
-        value = parts[1].strip()
+    # 简单校验：必须包含逗号；一次性切分出 (类型, 值) 两部分
+    # 输入来自 clean_rule_line，类型已是标准的大写形式，无需再 strip/upper
+    for std_type, _, raw_value in (line.partition(",") for line in rules if "," in line):
+        value = raw_value.strip()
 
         # 检查是否支持该类型
         if std_type not in CLASH_MAPPING:
@@ -88,9 +94,7 @@ def format_rules(
 
         # 特殊处理：为 IP-CIDR 类规则添加 ",no-resolve" 参数
         # 这可以防止 Clash 为了匹配 IP 规则而发起不必要的 DNS 解析
-        suffix_param = ""
-        if clash_type in ["IP-CIDR", "IP-CIDR6"]:
-            suffix_param = ",no-resolve"
+        suffix_param = ",no-resolve" if clash_type in _NO_RESOLVE else ""
         # [注意] IP-ASN 通常不需要强制加 no-resolve，视具体需求而定，这里保持原样不加。
 
         # 拼装最终的一行规则 (Clash YAML 列表项格式)
@@ -98,17 +102,9 @@ def format_rules(
         final_line = f"  - {clash_type},{value}{suffix_param}"
 
         # 3. 分桶逻辑 (Routing)
-        if std_type in TYPE_BUCKETS["DOMAIN"]:
-            buckets["Domain"].append(final_line)
-            has_data["Domain"] = True
-        elif std_type in TYPE_BUCKETS["IP"]:
-            # 包含了 IP-CIDR, GEOIP, IP-ASN 等
-            buckets["IP"].append(final_line)
-            has_data["IP"] = True
-        else:
-            # 所有其他类型（如 PROCESS-NAME）都放入 Classical 桶
-            buckets["Classical"].append(final_line)
-            has_data["Classical"] = True
+        # Domain / IP 类型直接查反向索引，所有其他类型（如 PROCESS-NAME）都放入 Classical 桶
+        bucket = TYPE_TO_BUCKET.get(std_type, "Classical")
+        buckets[bucket].append(final_line)
 
     # 4. 准备返回结果
     final_output = {}
@@ -119,8 +115,10 @@ def format_rules(
     MANDATORY_TYPES = ["Domain", "IP", "Classical"]
 
     for key, content_list in buckets.items():
-        # 只要 Key 在强制列表中，或者确实有数据，就添加到输出结果
-        if key in MANDATORY_TYPES or has_data[key]:
-            final_output[key] = content_list
+        # 只要 Key 在强制列表中，或者确实有数据 (桶内只有规则行，非空即有数据)，就添加到输出结果
+        if key in MANDATORY_TYPES or content_list:
+            # 去重：不同标准类型可能映射为同一 Clash 类型
+            # (如 DOMAIN-WILDCARD 与 DOMAIN-SUFFIX)，dict.fromkeys 保留首次出现的顺序
+            final_output[key] = chain(common_headers, dict.fromkeys(content_list))
 
     return final_output
@@ -1,5 +1,7 @@
 # core/rule/formatter_rule_loon.py
 
+from core.writer import render_header_lines
+
 # ----------------------------------------------------------------------
 # 模块元数据常量
 # 定义输出文件相关的基本信息，供 Writer 模块使用。
@@ -30,19 +32,13 @@ def format_rules(
     返回:
         List[str]: 格式化后的规则列表。
     """
-    formatted = []
-
-    # 1. 处理用户自定义头部
-    if header_lines:
-        # 遍历用户定义的头部注释行
-        for header in header_lines:
-            # 在每行前加上注释符号和空格，然后添加到结果中
-            formatted.append(f"{COMMENT_SYMBOL} {header}")
+    # 1. 处理用户自定义头部：在每行前加上注释符号和空格
+    formatted = list(render_header_lines(COMMENT_SYMBOL, header_lines))
 
     # 2. 添加规则内容
     # Loon 的规则格式与项目内部的清洗/排序后的标准格式兼容（如 DOMAIN-SUFFIX,google.com），
     # 因此可以直接将规则列表添加到结果中。
-    formatted.extend(rules)
+    formatted += rules
 
     # 返回包含头部和规则的最终列表
     return formatted
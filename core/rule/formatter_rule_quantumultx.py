@@ -1,5 +1,7 @@
 # core/rule/formatter_rule_quantumultx.py
 
+from core.writer import render_header_lines
+
 # ----------------------------------------------------------------------
 # 模块元数据常量
 # 定义输出文件相关的基本信息，供 Writer 模块使用。
@@ -48,39 +50,17 @@ def format_rules(
     返回:
         List[str]: 格式化为 QX 标准语法的规则列表。
     """
-    formatted = []
-
-    # 1. 处理用户自定义头部
-    if header_lines:
-        # 遍历用户定义的头部注释行
-        for header in header_lines:
-            # 在每行前加上注释符号和空格，然后添加到结果中
-            formatted.append(f"{COMMENT_SYMBOL} {header}")
+    # 1. 处理用户自定义头部：在每行前加上注释符号和空格
+    formatted = list(render_header_lines(COMMENT_SYMBOL, header_lines))
 
     # 2. 处理规则内容
-    # 遍历输入的标准规则列表
-    for line in rules:
-        # 如果规则行中没有逗号，说明格式不符合 "TYPE,value" 标准，跳过
-        if "," not in line:
-            continue
-
-        # 将标准规则行分割成类型和值两部分
-        parts = line.split(",", 1)
-        std_type = parts[0]  # 标准规则类型
-        value = parts[1]  # 规则值
-
-        # 检查标准规则类型是否在 QX 映射表中
-        if std_type not in QX_MAPPING:
-            # 如果是未知类型，则跳过此条规则
-            continue
-
-        # 根据映射表获取 Quantumult X 软件特有的规则类型
-        qx_type = QX_MAPPING[std_type]
-
-        # 按照 QX 格式重新拼装规则：TYPE,VALUE,POLICY
-        final_line = f"{qx_type},{value},{policy_tag}"
-        # 将最终格式化的规则添加到结果列表
-        formatted.append(final_line)
+    # 按照 QX 格式重新拼装规则：TYPE,VALUE,POLICY
+    # 没有逗号（不符合 "TYPE,value" 标准）或类型不在映射表中的规则直接跳过
+    formatted += [
+        f"{QX_MAPPING[std_type]},{value},{policy_tag}"
+        for std_type, sep, value in (line.partition(",") for line in rules)
+        if sep and std_type in QX_MAPPING
+    ]
 
     # 返回所有格式化后的规则列表
     return formatted
@@ -1,7 +1,28 @@
 # core/rule/processor_rule.py
 
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+
 from core.rule.cleaner_rule import clean_rule_line
-from core.constants import RULE_TYPE_PRIORITY, DEFAULT_PRIORITY
+from core.constants import (
+    RULE_TYPE_PRIORITY,
+    DEFAULT_PRIORITY,
+    PROCESS_PARALLEL_MIN_LINES,
+    PROCESS_CHUNK_LINES,
+)
+
+
+@lru_cache(maxsize=64)
+def _prio(raw_type):
+    """
+    (内部工具) 规则类型字段 -> 优先级。
+    不同的类型写法只有十几种，按原始字段缓存，命中后省去 strip/upper 与查表。
+    """
+    return RULE_TYPE_PRIORITY.get(raw_type.strip().upper(), DEFAULT_PRIORITY)
 
 
 def get_sort_key(line):
@@ -10,13 +31,70 @@ def get_sort_key(line):
     规则越重要（优先级数字越小），排得越靠前。
     """
     if "," in line:
-        rule_type = line.split(",")[0].strip().upper()
-        priority = RULE_TYPE_PRIORITY.get(rule_type, DEFAULT_PRIORITY)
+        priority = _prio(line.partition(",")[0])
     else:
         priority = DEFAULT_PRIORITY
     return (priority, line)
 
 
+def _rule_priority(clean_line):
+    """
+    (内部工具) 清洗后规则的类型优先级。
+    clean_rule_line 的输出固定为 "TYPE,value"，类型字段取出后直接走 _prio 缓存。
+    """
+    return _prio(clean_line.partition(",")[0])
+
+
+def _keyword_matcher(keywords):
+    """
+    (内部工具) 把一组关键词编译为一个正则的 search 方法。
+    一次扫描即可判断是否包含任一关键词，等价于 any(kw in text for kw in keywords)；
+    没有关键词时返回 None。
+    """
+    if not keywords:
+        return None
+    # 重复的关键词只会拉长分支列表，先按出现顺序去重
+    return re.compile("|".join(map(re.escape, dict.fromkeys(keywords)))).search
+
+
+def _clean_chunk(lines):
+    """(子进程) 清洗一段原始规则，返回与输入一一对应的清洗结果"""
+    return [clean_rule_line(line) for line in lines]
+
+
+def _clean_lines(candidates):
+    """
+    (内部工具) 对预处理后的规则行逐行执行 clean_rule_line，按原顺序返回结果。
+
+    清洗是逐行独立的纯函数，超过 PROCESS_PARALLEL_MIN_LINES 行时按块分发到
+    多个进程 (spawn) 并行执行；去重、过滤与计数仍在当前进程内顺序完成，
+    统计结果与串行处理完全一致。
+    单核机器或已在子进程中 (如 manager 的 --jobs 进程池) 时不开启进程池。
+    """
+    workers = os.cpu_count() or 1
+    if (
+        workers < 2
+        or len(candidates) < PROCESS_PARALLEL_MIN_LINES
+        or multiprocessing.parent_process() is not None
+    ):
+        return map(clean_rule_line, candidates)
+
+    # 只把不重复的原始行发给子进程，多个上游源合并时能显著减少传输量
+    unique_lines = list(dict.fromkeys(candidates))
+    chunks = [
+        unique_lines[i : i + PROCESS_CHUNK_LINES]
+        for i in range(0, len(unique_lines), PROCESS_CHUNK_LINES)
+    ]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        cleaned = dict(
+            zip(unique_lines, chain.from_iterable(pool.map(_clean_chunk, chunks)))
+        )
+    return map(cleaned.__getitem__, candidates)
+
+
 def process_rules(cfg: dict, raw_rules: list[str]) -> tuple[list[str], dict]:
     """
     [规则处理器]
@@ -33,48 +111,56 @@ def process_rules(cfg: dict, raw_rules: list[str]) -> tuple[list[str], dict]:
     count_source_dupe = 0
     count_filtered = 0
 
+    # 过滤配置只取一次，后续各项直接从中读取
+    filters = cfg.get("filters", {})
+
     # 1. 加载“忽略规则” (黑名单)
-    ignored_set = set()
-    for item in cfg.get("filters", {}).get("ignored_rules", []):
-        clean_item = clean_rule_line(item)
-        if clean_item:
-            ignored_set.add(clean_item)
+    # 只读的成员检查表，一次性构建为 frozenset；清洗失败 (None) 的条目被 filter 丢弃
+    ignored_set = frozenset(
+        filter(None, map(clean_rule_line, filters.get("ignored_rules", [])))
+    )
 
     # 加载关键词过滤配置
-    exclude_keywords = [
-        k.lower() for k in cfg.get("filters", {}).get("exclude_keywords", [])
-    ]
-    include_keywords = [
-        k.lower() for k in cfg.get("filters", {}).get("include_keywords", [])
-    ]
+    exclude_keywords = [k.lower() for k in filters.get("exclude_keywords", [])]
+    include_keywords = [k.lower() for k in filters.get("include_keywords", [])]
+    exclude_search = _keyword_matcher(exclude_keywords)
+    include_search = _keyword_matcher(include_keywords)
+    # 没有配置任何关键词时，循环里连小写化都可以省掉
+    use_keywords = bool(exclude_search or include_search)
 
     # 2. 加载“VIP 规则” (最高优先级，手动添加)
-    vip_set = set()
-    raw_extra = cfg.get("filters", {}).get("extra_rules", [])
+    # VIP 池：clean_line -> (优先级, clean_line)，与普通池同构
+    vip_entries = {}
+    raw_extra = filters.get("extra_rules", [])
 
     for item in raw_extra:
         clean_item = clean_rule_line(item)
         if clean_item:
-            vip_set.add(clean_item)
+            vip_entries[clean_item] = (_rule_priority(clean_item), clean_item)
 
-    count_vip_added = len(vip_set)
+    count_vip_added = len(vip_entries)
 
     # 3. 处理下载的规则
-    common_set = set()
+    # 普通池：clean_line -> (优先级, clean_line)，入池时算好优先级，排序时不再重复解析
+    common_entries = {}
 
-    for line in raw_rules:
-        clean_line = clean_rule_line(line)
+    # 预处理：整批去除两端空白，并提前剔除空行与整行注释 (! 或 # 开头)
+    # 去除空白后，仅行尾空白/换行不同的重复行也能命中 clean_rule_line 的缓存
+    candidates = [s for s in map(str.strip, raw_rules) if s and s[0] not in "!#"]
+    count_invalid += count_raw_download - len(candidates)
+
+    for clean_line in _clean_lines(candidates):
         if not clean_line:
             count_invalid += 1
             continue
 
         # 优先级检查：如果 VIP 里已经有了，跳过
-        if clean_line in vip_set:
+        if clean_line in vip_entries:
             count_vip_dupe += 1
             continue
 
         # 去重检查：如果普通池里已经有了，跳过
-        if clean_line in common_set:
+        if clean_line in common_entries:
             count_source_dupe += 1
             continue
 
@@ -82,29 +168,26 @@ def process_rules(cfg: dict, raw_rules: list[str]) -> tuple[list[str], dict]:
         is_filtered = False
         if clean_line in ignored_set:
             is_filtered = True
-        else:
+        elif use_keywords:
             line_lower = clean_line.lower()
             # 排除关键词
-            if any(kw in line_lower for kw in exclude_keywords):
+            if exclude_search and exclude_search(line_lower):
                 is_filtered = True
             # 包含关键词
-            elif include_keywords:
-                if not any(kw in line_lower for kw in include_keywords):
-                    is_filtered = True
+            elif include_search and not include_search(line_lower):
+                is_filtered = True
 
         if is_filtered:
             count_filtered += 1
             continue
 
-        # 通过所有检查，加入集合
-        common_set.add(clean_line)
+        # 通过所有检查，加入普通池
+        common_entries[clean_line] = (_rule_priority(clean_line), clean_line)
 
     # 4. 排序合并
-    vip_list = list(vip_set)
-    common_list = list(common_set)
-
-    vip_list.sort(key=get_sort_key)
-    common_list.sort(key=get_sort_key)
+    # 元组按 (优先级, 规则) 比较，与 get_sort_key 的排序结果一致
+    vip_list = [line for _, line in sorted(vip_entries.values())]
+    common_list = [line for _, line in sorted(common_entries.values())]
 
     final_result = vip_list + common_list
     total_count = len(final_result)
@@ -2,7 +2,9 @@
 
 import os
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter
+from functools import lru_cache
+from itertools import chain
 
 from core.constants import (
     PROJECT_AUTHOR,
@@ -14,6 +16,43 @@ from core.constants import (
 )
 from core.logger import Logger
 
+# 输出文件的打开方式：截断重写；Windows 下需显式指定 O_BINARY，避免换行被转换
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def render_header_lines(prefix, header_lines) -> tuple:
+    """
+    [头部注释渲染]
+
+    把配置中的自定义头部渲染为 "<prefix> <header>" 注释行，供各格式化器共用。
+    同一组头部在一次运行中会被 Clash / Loon / QX 反复渲染，结果按
+    (prefix, 头部) 缓存，命中时直接复用同一份元组。
+
+    prefix: 注释前缀，如 "#" 或 Clash 缩进后的 "  #"
+    header_lines: 配置中的 header 列表 (可为 None)
+    """
+    if not header_lines:
+        return ()
+    try:
+        return _render_header_lines(prefix, tuple(header_lines))
+    except TypeError:
+        # 头部里混入了不可哈希的值 (如 YAML 误写成映射)，不走缓存直接拼装
+        return tuple(f"{prefix} {header}" for header in header_lines)
+
+
+@lru_cache(maxsize=256)
+def _render_header_lines(prefix, header_lines):
+    return tuple(f"{prefix} {header}" for header in header_lines)
+
+
+@lru_cache(maxsize=None)
+def _static_preamble(comment_symbol):
+    """AUTHOR / REPO 两行在整个运行期间不变，每种注释符号只拼装一次"""
+    return (
+        f"{comment_symbol} AUTHOR: {PROJECT_AUTHOR}",
+        f"{comment_symbol} REPO: {PROJECT_REPO}",
+    )
+
 
 def write_output(
     project_root,
@@ -32,64 +71,117 @@ def write_output(
     负责创建目录并写入文件。
     所有的日志输出（成功/失败）均使用 Logger 的变量。
     """
+    return write_outputs(
+        project_root,
+        category,
+        subdir_name,
+        cfg,
+        {filename_suffix: rules},
+        comment_symbol=comment_symbol,
+        file_extension=file_extension,
+        sub_path=sub_path,
+    )
+
+
+def write_outputs(
+    project_root,
+    category,
+    subdir_name,
+    cfg,
+    outputs,
+    comment_symbol="#",
+    file_extension="list",
+    sub_path="",
+) -> bool:
+    """
+    [批量文件写入器]
+
+    将同一格式的多个文件 (如 Clash 的 Domain / IP / Classical) 写入同一目录。
+    目录创建、文件名前缀与更新时间只处理一次，每个文件仍只有一次 write 调用。
+
+    outputs: {文件名后缀: 规则行}
+    返回: 全部文件写入成功时为 True
+    """
     output_dir = os.path.join(project_root, category, subdir_name, sub_path)
 
-    if not os.path.exists(output_dir):
-        try:
-            os.makedirs(output_dir, exist_ok=True)
-        except OSError as e:
-            # [清洗点] 创建目录失败
-            msg = f"{Logger.WORD_DIR_FAIL}: {output_dir} ({e})"
-            Logger.log_generic_message(MSG_ERROR, msg)
-            return False
+    # exist_ok=True 已覆盖目录存在的情况，无需先 stat 一次
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+    except OSError as e:
+        # [清洗点] 创建目录失败
+        msg = f"{Logger.WORD_DIR_FAIL}: {output_dir} ({e})"
+        Logger.log_generic_message(MSG_ERROR, msg)
+        return False
 
     clean_ext = file_extension.lstrip(".")
     base_name = cfg.get("output_filename", "Output")
-    filename = f"{base_name}{filename_suffix}.{clean_ext}"
-    path = os.path.join(output_dir, filename)
-
-    count = defaultdict(int)
-    valid_rule_count = 0
-
-    for r in rules:
-        r_stripped = r.strip()
-        if not r_stripped or r_stripped.startswith(comment_symbol):
-            continue
-
-        # 统计规则类型
-        if "," in r:
-            # 1. 原始切割
-            raw_type_str = r.split(",", 1)[0].strip().upper()
-            # 2. 智能清洗前缀
-            # 如果字符串以 "- " 开头（Clash YAML 列表格式），去掉它
-            # 使用 lstrip 移除左侧的 "-" 和空格
-            rule_type = raw_type_str.lstrip("-").strip()
-
-            if rule_type:
-                count[rule_type] += 1
-                valid_rule_count += 1
-
     updated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    try:
-        with open(path, "w", encoding="utf-8", newline="\n") as f:
-            f.write(f"{comment_symbol} NAME: {cfg.get('name', 'Unknown')}\n")
-            f.write(f"{comment_symbol} AUTHOR: {PROJECT_AUTHOR}\n")
-            f.write(f"{comment_symbol} REPO: {PROJECT_REPO}\n")
-            f.write(f"{comment_symbol} UPDATED: UTC+8 {updated}\n")
+    all_ok = True
+    for filename_suffix, rules in outputs.items():
+        filename = f"{base_name}{filename_suffix}.{clean_ext}"
+        path = os.path.join(output_dir, filename)
+        if not _write_file(path, cfg, rules, comment_symbol, updated):
+            all_ok = False
+
+    return all_ok
 
-            sorted_types = sorted(
-                count.keys(), key=lambda k: RULE_TYPE_PRIORITY.get(k, DEFAULT_PRIORITY)
-            )
 
-            for k in sorted_types:
-                if count[k] > 0:
-                    f.write(f"{comment_symbol} {k}: {count[k]}\n")
+def _write_file(path, cfg, rules, comment_symbol, updated) -> bool:
+    """
+    写入单个文件：统计规则类型、拼装元数据头部后一次性写出
 
-            f.write(f"{comment_symbol} TOTAL: {valid_rule_count}\n")
+    rules 为格式化器的输出：规则行 (rule) 或重写行 (rewrite)，外加头部注释行。
+    重写行的内容里可能出现 "#" 等符号，只有以注释符号开头的行才按注释跳过。
+    """
+    # 格式化器可能逐行产出 (生成器)；头部的类型统计要先于规则内容写出，
+    # 因此在统计的同一趟遍历中把内容收集到 body，只遍历一次 rules
+    body = []
+    keep = body.append
+
+    def rule_types():
+        # 统计规则类型：只统计含逗号的规则，空行自然不含逗号
+        # 注释行 (可能带逗号，如自定义头部) 的注释符号必然在第一个逗号之前，
+        # 因此只需检查切出的类型段是否以注释符号开头，不必再对整行 strip
+        # 类型清洗：去掉 Clash YAML 列表格式的 "- " 前缀
+        for r in rules:
+            keep(r)
+            if "," in r:
+                head = r.partition(",")[0]
+                if not head.lstrip().startswith(comment_symbol):
+                    yield head.strip().upper().lstrip("-").strip()
+
+    # 计数交给 Counter 在 C 层完成，不再逐条 count[rule_type] += 1
+    count = Counter(filter(None, rule_types()))
+    valid_rule_count = sum(count.values())
+
+    # Counter 只含出现过的类型 (计数均大于 0)，直接按优先级排序 (类型, 数量) 对
+    sorted_counts = sorted(
+        count.items(), key=lambda kv: RULE_TYPE_PRIORITY.get(kv[0], DEFAULT_PRIORITY)
+    )
+
+    header = [
+        f"{comment_symbol} NAME: {cfg.get('name', 'Unknown')}",
+        *_static_preamble(comment_symbol),
+        f"{comment_symbol} UPDATED: UTC+8 {updated}",
+    ]
+    header += [f"{comment_symbol} {k}: {v}" for k, v in sorted_counts]
+    header.append(f"{comment_symbol} TOTAL: {valid_rule_count}")
+
+    # 整个文件先在内存中拼成一块字节数据，再一次性写入，避免逐行 write 调用
+    # 末尾追加一个空串让 join 直接带上结尾换行，免得对整块字节再做一次拼接复制
+    blob = "\n".join(chain(header, body, ("",))).encode("utf-8")
 
-            for line in rules:
-                f.write(line + "\n")
+    try:
+        # 直接走文件描述符写出，绕过 Python 的缓冲文件对象；
+        # os.write 可能只写入一部分 (如被信号中断)，循环直到全部写完
+        fd = os.open(path, _WRITE_FLAGS, 0o644)
+        try:
+            view = memoryview(blob)
+            while view:
+                view = view[os.write(fd, view) :]
+        finally:
+            os.close(fd)
 
         # [清洗点] 写入成功
         try:
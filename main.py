@@ -59,6 +59,15 @@ def parse_args():
         "--ci", action="store_true", help="启用 CI 机器模式 (无装饰/GitHub格式)"
     )
 
+    # --- 下面定义并行相关的参数 ---
+
+    # 添加 --jobs 参数。
+    # 指定同时处理多少个配置任务（每个任务在独立的子进程中运行）。
+    # 默认为 1，即逐个顺序处理；传入 0 表示使用全部 CPU 核心。
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="并行处理的任务数 (0 = 全部 CPU 核心)"
+    )
+
     # 执行解析操作。
     # 系统会检查用户在命令行实际输入了什么，并把结果打包返回。
     return parser.parse_args()
@@ -116,7 +125,8 @@ def main():
     # 第三步：初始化核心管理器 (Manager)。
     # 我们把计算好的日志等级和风格传递给 Manager，
     # 这样 Manager 在后续工作中就知道该怎么输出日志了。
-    manager = Manager(level=level, style=style)
+    # 同时把 --jobs 指定的并行任务数交给 Manager。
+    manager = Manager(level=level, style=style, jobs=args.jobs)
 
     # 第四步：启动程序。
     # 调用 manager 的 run 方法，正式开始执行程序的核心业务逻辑（比如抓取规则、聚合数据等）。